@@ -22,13 +22,71 @@ are actually spelled out with letters: one, two, three, four, five, six, seven,
 Equipped with this new information, you now need to find the real first and last digit on each line.
 """
 
+import mmap
+import os
+import time
+from multiprocessing import Pool
+
 # Input files
 EXAMPLE_1 = "./example_1.txt"
 EXAMPLE_2 = "./example_2.txt"
+EXAMPLE_3 = "./example_3.txt"
 INPUT = "./input.txt"
 
+CHUNK_SIZE = 64 * 1024 * 1024
+
 # Words
 NUMBERS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+DIGITS = {str(num): str(num) for num in range(10)}
+VOCABULARY = DIGITS | {
+    word_num: str(num + 1) for num, word_num in enumerate(NUMBERS)
+}
+
+
+def build_trie(vocabulary: dict, reverse: bool = False) -> dict:
+    """Builds a trie over the vocabulary words; the `None` key holds the digit of a word."""
+    trie = {}
+    for word, digit in vocabulary.items():
+        node = trie
+        for char in word[::-1] if reverse else word:
+            node = node.setdefault(char, {})
+        node[None] = digit
+    return trie
+
+
+def match_trie(line: str, trie: dict, indices: range) -> str | None:
+    """Returns the digit of the first word found walking `indices` through the trie."""
+    step = indices.step
+    end = len(line) if step > 0 else -1
+    for idx in indices:
+        node = trie
+        pos = idx
+        while pos != end and line[pos] in node:
+            node = node[line[pos]]
+            if None in node:
+                return node[None]
+            pos += step
+    return None
+
+
+def decode_line(line: str, trie: dict, reverse_trie: dict) -> int:
+    first = match_trie(line, trie, range(len(line)))
+    last = match_trie(line, reverse_trie, range(len(line) - 1, -1, -1))
+    return int(first + last)
+
+
+def decode_text_automaton(filename: str, vocabulary: dict = VOCABULARY, debug: bool = False) -> int:
+    trie = build_trie(vocabulary)
+    reverse_trie = build_trie(vocabulary, reverse=True)
+    calibration_sum = 0
+    with open(filename, 'r', encoding='utf-8') as example:
+        for line in example:
+            line = line.rstrip('\n')
+            code = decode_line(line, trie, reverse_trie)
+            if debug:
+                print(line, code)
+            calibration_sum += code
+    return calibration_sum
 
 
 def decode_text_part_one(filename: str, debug: bool = False) -> int:
@@ -63,6 +121,108 @@ def decode_text_part_two(filename: str, debug: bool = False) -> int:
     return calibration_sum
 
 
+class CalibrationTotals:
+    """Running Part One and Part Two sums, updated one appended line at a time."""
+
+    def __init__(self, vocabulary: dict = VOCABULARY) -> None:
+        self.part_one: int = 0
+        self.part_two: int = 0
+        self.lines: int = 0
+        self.tries: list[tuple[dict, dict]] = [
+            (build_trie(DIGITS), build_trie(DIGITS, reverse=True)),
+            (build_trie(vocabulary), build_trie(vocabulary, reverse=True)),
+        ]
+
+    def add_line(self, line: str) -> None:
+        """Adds one line to both totals, raising ValueError if either part finds no digit."""
+        line = line.rstrip('\n')
+        if not line:
+            return
+        codes = []
+        for trie, reverse_trie in self.tries:
+            first = match_trie(line, trie, range(len(line)))
+            if first is None:
+                raise ValueError(f"No calibration digit in line: {line!r}")
+            last = match_trie(line, reverse_trie, range(len(line) - 1, -1, -1))
+            codes.append(int(first + last))
+        self.part_one += codes[0]
+        self.part_two += codes[1]
+        self.lines += 1
+
+    def add_lines(self, lines) -> tuple[int, int]:
+        for line in lines:
+            self.add_line(line)
+        return self.part_one, self.part_two
+
+    def follow(self, filename: str, poll_interval: float = 1.0):
+        """Tails the file like `tail -f`, yielding both totals after each complete line."""
+        pending = ""
+        with open(filename, 'r', encoding='utf-8') as file:
+            while True:
+                chunk = file.readline()
+                if not chunk:
+                    time.sleep(poll_interval)
+                    continue
+                pending += chunk
+                if pending.endswith('\n'):
+                    self.add_line(pending)
+                    pending = ""
+                    yield self.part_one, self.part_two
+
+
+def split_chunks(mapped: mmap.mmap, chunk_size: int) -> list[tuple[int, int]]:
+    """Splits the mapped file into (start, end) byte ranges ending on a newline."""
+    chunks = []
+    start = 0
+    while start < len(mapped):
+        end = mapped.find(b"\n", min(start + chunk_size, len(mapped)) - 1)
+        end = len(mapped) if end == -1 else end + 1
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+
+def decode_chunk(args: tuple[str, int, int, dict]) -> int:
+    filename, start, end, vocabulary = args
+    vocabulary = {word.encode(): digit for word, digit in vocabulary.items()}
+    trie = build_trie(vocabulary)
+    reverse_trie = build_trie(vocabulary, reverse=True)
+    calibration_sum = 0
+    with open(filename, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            pos = start
+            while pos < end:
+                line_end = mapped.find(b"\n", pos, end)
+                line_end = end if line_end == -1 else line_end
+                calibration_sum += decode_line(mapped[pos:line_end], trie, reverse_trie)
+                pos = line_end + 1
+    return calibration_sum
+
+
+def decode_text_bulk(
+    filename: str, part_two: bool = True, processes: int = None, chunk_size: int = CHUNK_SIZE
+) -> int:
+    """Decodes a memory-mapped file in newline-aligned chunks across a process pool."""
+    vocabulary = VOCABULARY if part_two else DIGITS
+    if os.path.getsize(filename) == 0:
+        return 0
+    with open(filename, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            chunks = split_chunks(mapped, chunk_size)
+    tasks = [(filename, start, end, vocabulary) for start, end in chunks]
+    with Pool(processes) as pool:
+        return sum(pool.imap_unordered(decode_chunk, tasks))
+
+
+def benchmark(filename: str, repeat: int = 5) -> None:
+    for decoder in (decode_text_part_two, decode_text_automaton):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            decoder(filename)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"{decoder.__name__}: {elapsed * 1000:.2f} ms")
+
+
 def main() -> None:
     test_one = False
     test_two = False
@@ -76,6 +236,30 @@ def main() -> None:
     if example_calibration == 281:
         print("PASSED TEST: EXAMPLE 2")
         test_two = True
+
+    example_calibration = decode_text_automaton(EXAMPLE_2)
+    if example_calibration == 281 and decode_text_automaton(EXAMPLE_1, VOCABULARY) == 142:
+        print("PASSED TEST: AUTOMATON")
+
+    if decode_text_bulk(EXAMPLE_1, part_two=False) == 142 and decode_text_bulk(EXAMPLE_2) == 281:
+        print("PASSED TEST: BULK")
+
+    if decode_text_bulk(EXAMPLE_3) == decode_text_part_two(EXAMPLE_3) and decode_text_bulk(
+        EXAMPLE_3, part_two=False
+    ) == decode_text_part_one(EXAMPLE_3):
+        print("PASSED TEST: BULK WITH ZEROS")
+
+    totals = CalibrationTotals()
+    with open(EXAMPLE_1, 'r', encoding='utf-8') as example:
+        totals.add_lines(example)
+    with open(EXAMPLE_3, 'r', encoding='utf-8') as example:
+        totals.add_lines(example)
+    expected = (
+        decode_text_part_one(EXAMPLE_1) + decode_text_part_one(EXAMPLE_3),
+        decode_text_part_two(EXAMPLE_1) + decode_text_part_two(EXAMPLE_3),
+    )
+    if (totals.part_one, totals.part_two) == expected:
+        print("PASSED TEST: INCREMENTAL")
     
     if test_one:
         input_calibration = decode_text_part_one(INPUT)
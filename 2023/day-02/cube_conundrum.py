@@ -32,6 +32,10 @@ As you continue your walk, the Elf poses a second question: in each game you pla
 what is the fewest number of cubes of each color that could have been in the bag to make the game possible?
 """
 
+import re
+
+import numpy as np
+
 RED = 12
 GREEN = 13
 BLUE = 14
@@ -40,6 +44,11 @@ EXAMPLE = "./example_1.txt"
 
 INPUT = "./input.txt"
 
+GAME_PATTERN = re.compile(r"Game (\d+)")
+CUBES_PATTERN = re.compile(r"(\d+) (red|green|blue)")
+COLORS = ("red", "green", "blue")
+BATCH_CELLS = 1 << 24
+
 
 def is_game_possible(cube_color: str, num_cubes: int) -> bool:
     if cube_color == "red" and num_cubes <= RED:
@@ -105,6 +114,57 @@ def all_elf_lies_part_two(filename: str, debug: bool = False) -> int:
     return possible_cubes_sum
 
 
+def parse_game(line: str) -> tuple[int, dict]:
+    game_id = int(GAME_PATTERN.match(line).group(1))
+    max_cubes = {"red": 0, "green": 0, "blue": 0}
+    for num_cubes, cube_color in CUBES_PATTERN.findall(line):
+        num_cubes = int(num_cubes)
+        if num_cubes > max_cubes[cube_color]:
+            max_cubes[cube_color] = num_cubes
+    return game_id, max_cubes
+
+
+def all_elf_lies_both_parts(filename: str, debug: bool = False) -> tuple[int, int]:
+    possible_games_sum = 0
+    possible_cubes_sum = 0
+    with open(filename, 'r', encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            game_id, max_cubes = parse_game(line)
+            if all(is_game_possible(color, num) for color, num in max_cubes.items()):
+                if debug:
+                    print(f"Game {game_id} should be possible.")
+                possible_games_sum += game_id
+            possible_cubes_sum += max_cubes["red"] * max_cubes["green"] * max_cubes["blue"]
+    return possible_games_sum, possible_cubes_sum
+
+
+def load_game_columns(filename: str) -> tuple[np.ndarray, np.ndarray]:
+    """Parses games once into an ID column and an (n, 3) column of red/green/blue maxima."""
+    game_ids, maxima = [], []
+    with open(filename, 'r', encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            game_id, max_cubes = parse_game(line)
+            game_ids.append(game_id)
+            maxima.append([max_cubes[color] for color in COLORS])
+    return np.array(game_ids, dtype=np.int64), np.array(maxima, dtype=np.int64).reshape(-1, 3)
+
+
+def possible_games_sums(game_ids: np.ndarray, maxima: np.ndarray, bags) -> np.ndarray:
+    """Returns the possible-games ID sum for every (red, green, blue) bag limit in `bags`."""
+    bags = np.asarray(bags, dtype=np.int64).reshape(-1, 3)
+    sums = np.empty(len(bags), dtype=np.int64)
+    batch = max(1, BATCH_CELLS // max(1, len(game_ids)))
+    for start in range(0, len(bags), batch):
+        limits = bags[start:start + batch]
+        possible = (maxima[None, :, :] <= limits[:, None, :]).all(axis=2)
+        sums[start:start + batch] = possible @ game_ids
+    return sums
+
+
 def main() -> None:
     test_one = False
     test_two = False
@@ -118,6 +178,13 @@ def main() -> None:
     if possible_games_sum == 2286:
         print("PASSED TEST: EXAMPLE 2")
         test_two = True
+
+    if all_elf_lies_both_parts(EXAMPLE) == (8, 2286):
+        print("PASSED TEST: BOTH PARTS")
+
+    game_ids, maxima = load_game_columns(EXAMPLE)
+    if possible_games_sums(game_ids, maxima, [(RED, GREEN, BLUE), (0, 0, 0)]).tolist() == [8, 0]:
+        print("PASSED TEST: BAG QUERIES")
     
     if test_one:
         input_possible_games_sum = all_elf_lies(INPUT)
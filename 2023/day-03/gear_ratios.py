@@ -42,12 +42,30 @@ This time, you need to find the gear ratio of every gear and add them all up
 so that the engineer can figure out which gear needs to be replaced.
 """
 
+import mmap
+import os
 import re
+from itertools import chain
+from multiprocessing import Pool
+
+import numpy as np
 
 # Input files
 EXAMPLE_1 = "./example_1.txt"
+
+EXAMPLE_2 = "./example_2.txt"
+
 INPUT = "./input.txt"
 
+BAND_SIZE = 16 * 1024 * 1024
+
+# Digits of the shortest number that overflows int64, and the longest numbers
+# whose sums stay in int64 for any realistic schematic
+MAX_INT64_DIGITS = 19
+SAFE_DIGITS = 9
+
+NUMBER_PATTERN = re.compile(r"\d+")
+
 
 def get_matrix(schematic: list) -> bool:
     matrix = []
@@ -104,6 +122,365 @@ def get_gear_ratios(filename: str) -> int:
     return sum([possible_gears[i] for i in list(set(gear_idxs))])
 
 
+def index_symbols(schematic: list) -> dict:
+    """Maps every symbol cell (row, col) to its symbol ID and character."""
+    symbols = {}
+    for row, line in enumerate(schematic):
+        for col, c in enumerate(line.rstrip("\n")):
+            if not c.isdigit() and c != ".":
+                symbols[(row, col)] = (len(symbols), c)
+    return symbols
+
+
+def adjacent_symbols(symbols: dict, row: int, start: int, end: int) -> set:
+    """Returns (symbol ID, character) of symbols touching the number at row[start:end]."""
+    found = set()
+    for r in range(row - 1, row + 2):
+        for col in range(start - 1, end + 1):
+            symbol = symbols.get((r, col))
+            if symbol is not None:
+                found.add(symbol)
+    return found
+
+
+def scan_schematic(schematic: list) -> tuple[int, int]:
+    symbols = index_symbols(schematic)
+    sum_of_parts = 0
+    gears = {}
+    for row, line in enumerate(schematic):
+        for match in NUMBER_PATTERN.finditer(line):
+            neighbours = adjacent_symbols(symbols, row, match.start(), match.end())
+            if not neighbours:
+                continue
+            num = int(match.group())
+            sum_of_parts += num
+            for symbol_id, c in neighbours:
+                if c == "*":
+                    gears.setdefault(symbol_id, []).append(num)
+    gear_ratios = sum(nums[0] * nums[1] for nums in gears.values() if len(nums) == 2)
+    return sum_of_parts, gear_ratios
+
+
+def get_parts_and_gears(filename: str) -> tuple[int, int]:
+    with open(filename, "r", encoding="utf-8") as file:
+        return scan_schematic(file.readlines())
+
+
+def scan_window(previous: str, current: str, following: str, keys: tuple) -> list:
+    """Returns (number, adjacent '*' cells) for every part number in the current row.
+
+    Cells are (key, col) where key is the entry of `keys` for the row the '*' is in.
+    """
+    parts = []
+    for match in NUMBER_PATTERN.finditer(current):
+        is_part = False
+        stars = []
+        for key, line in zip(keys, (previous, current, following)):
+            for col in range(max(0, match.start() - 1), min(len(line), match.end() + 1)):
+                c = line[col]
+                if not c.isdigit() and c != ".":
+                    is_part = True
+                    if c == "*":
+                        stars.append((key, col))
+        if is_part:
+            parts.append((int(match.group()), stars))
+    return parts
+
+
+def scan_rows(rows):
+    """Slides a three-row window over (key, line) pairs and yields (key, number, stars)
+    for the part numbers of each middle row. The first and last pairs are only halos."""
+    window = []
+    for row in rows:
+        window.append(row)
+        if len(window) == 3:
+            (prev_key, previous), (key, current), (next_key, following) = window
+            for num, stars in scan_window(previous, current, following, (prev_key, key, next_key)):
+                yield key, num, stars
+            window.pop(0)
+
+
+def stream_schematic(lines):
+    """Yields ("part", number) and ("gear", ratio) while keeping only three rows in memory."""
+    rows = chain(
+        [(None, "")],
+        ((row, line.rstrip("\n")) for row, line in enumerate(lines)),
+        [(None, "")],
+    )
+    gears = {}
+    last_row = 0
+    for row, num, stars in scan_rows(rows):
+        if row != last_row:
+            for cell in [cell for cell in gears if cell[0] <= row - 2]:
+                nums = gears.pop(cell)
+                if len(nums) == 2:
+                    yield "gear", nums[0] * nums[1]
+            last_row = row
+        yield "part", num
+        for cell in stars:
+            gears.setdefault(cell, []).append(num)
+    for nums in gears.values():
+        if len(nums) == 2:
+            yield "gear", nums[0] * nums[1]
+
+
+def get_parts_and_gears_streaming(filename: str) -> tuple[int, int]:
+    totals = {"part": 0, "gear": 0}
+    with open(filename, "r", encoding="utf-8") as file:
+        for kind, value in stream_schematic(file):
+            totals[kind] += value
+    return totals["part"], totals["gear"]
+
+
+def split_bands(mapped: mmap.mmap, band_size: int) -> list[tuple[int, int]]:
+    """Cuts the mapped schematic into row bands of about band_size bytes, each ending after a full row."""
+    bands = []
+    start = 0
+    while start < len(mapped):
+        end = mapped.find(b"\n", min(start + band_size, len(mapped)) - 1)
+        end = len(mapped) if end == -1 else end + 1
+        bands.append((start, end))
+        start = end
+    return bands
+
+
+def scan_band(args: tuple[str, int, int]) -> tuple[int, int, dict]:
+    """Scans the rows in bytes [start, end) with one halo row on each side.
+
+    Rows are keyed by their byte offset. Gears on the halo and edge rows may also touch
+    numbers of the neighbouring bands, so they are returned unresolved for merging.
+    """
+    filename, start, end = args
+    with open(filename, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            previous_row = mapped.rfind(b"\n", 0, start - 1) + 1 if start else None
+
+            def read_line(pos: int) -> tuple[int, str, int]:
+                line_end = mapped.find(b"\n", pos)
+                line_end = len(mapped) if line_end == -1 else line_end
+                return pos, mapped[pos:line_end].decode("utf-8"), line_end
+
+            def band_rows():
+                yield read_line(previous_row)[:2] if start else (previous_row, "")
+                pos = start
+                while pos < end:
+                    row_start, row, line_end = read_line(pos)
+                    yield row_start, row
+                    pos = line_end + 1
+                yield read_line(end)[:2] if end < len(mapped) else (None, "")
+
+            last_row = max(start, mapped.rfind(b"\n", start, end - 1) + 1)
+            edge_rows = {previous_row, start, last_row, end}
+            sum_of_parts = 0
+            gears = {}
+            for _, num, stars in scan_rows(band_rows()):
+                sum_of_parts += num
+                for cell in stars:
+                    gears.setdefault(cell, []).append(num)
+    gear_ratios = 0
+    edge_gears = {}
+    for cell, nums in gears.items():
+        if cell[0] in edge_rows:
+            edge_gears[cell] = nums
+        elif len(nums) == 2:
+            gear_ratios += nums[0] * nums[1]
+    return sum_of_parts, gear_ratios, edge_gears
+
+
+def get_parts_and_gears_parallel(
+    filename: str, processes: int = None, band_size: int = BAND_SIZE
+) -> tuple[int, int]:
+    """Scans row bands with one-row halos in a process pool and merges the totals."""
+    if os.path.getsize(filename) == 0:
+        return 0, 0
+    with open(filename, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            bands = split_bands(mapped, band_size)
+    sum_of_parts, gear_ratios = 0, 0
+    edge_gears = {}
+    with Pool(processes) as pool:
+        tasks = [(filename, start, end) for start, end in bands]
+        for parts, ratios, gears in pool.imap_unordered(scan_band, tasks):
+            sum_of_parts += parts
+            gear_ratios += ratios
+            for cell, nums in gears.items():
+                edge_gears.setdefault(cell, []).extend(nums)
+    gear_ratios += sum(nums[0] * nums[1] for nums in edge_gears.values() if len(nums) == 2)
+    return sum_of_parts, gear_ratios
+
+
+def load_grid(schematic: list) -> np.ndarray:
+    """Loads the schematic into a uint8 array padded by one '.' cell on every side."""
+    lines = [line.rstrip("\n") for line in schematic]
+    width = max((len(line) for line in lines), default=0)
+    grid = np.full((len(lines) + 2, width + 2), ord("."), dtype=np.uint8)
+    for row, line in enumerate(lines):
+        grid[row + 1, 1:len(line) + 1] = np.frombuffer(line.encode("ascii"), dtype=np.uint8)
+    return grid
+
+
+def dilate(mask: np.ndarray) -> np.ndarray:
+    """Returns the 8-neighbourhood dilation of a mask whose border cells are all False."""
+    dilated = mask.copy()
+    for i in range(-1, 2):
+        for j in range(-1, 2):
+            dilated |= np.roll(mask, (i, j), axis=(0, 1))
+    return dilated
+
+
+def get_parts_and_gears_numpy(filename: str) -> tuple[int, int]:
+    with open(filename, "r", encoding="utf-8") as file:
+        return get_parts_and_gears_numpy_lines(file.readlines())
+
+
+def get_parts_and_gears_numpy_lines(schematic: list) -> tuple[int, int]:
+    grid = load_grid(schematic)
+    digits = (grid >= ord("0")) & (grid <= ord("9"))
+    symbols = ~digits & (grid != ord("."))
+
+    # Label runs of digits, the padding keeps runs from wrapping across rows
+    flat_digits = digits.ravel()
+    starts = flat_digits & ~np.concatenate(([False], flat_digits[:-1]))
+    labels = np.where(flat_digits, np.cumsum(starts), 0)
+    cells = np.flatnonzero(flat_digits)
+    cell_labels = labels[cells]
+    num_labels = int(starts.sum())
+
+    # Value of each run: every digit weighted by its distance to the end of the run
+    run_ends = np.zeros(num_labels + 1, dtype=np.int64)
+    np.maximum.at(run_ends, cell_labels, cells)
+    run_lengths = np.bincount(cell_labels, minlength=num_labels + 1)
+    exponents = run_ends[cell_labels] - cells
+    weights = 10 ** np.where(exponents < MAX_INT64_DIGITS, exponents, 0)
+    values = np.zeros(num_labels + 1, dtype=np.int64)
+    np.add.at(values, cell_labels, (grid.ravel()[cells] - ord("0")).astype(np.int64) * weights)
+    if run_lengths.max(initial=0) > SAFE_DIGITS:
+        # Sums of long numbers can overflow int64, runs too long for int64 are read exactly
+        values = values.astype(object)
+        for label in np.flatnonzero(run_lengths >= MAX_INT64_DIGITS):
+            end = run_ends[label] + 1
+            values[label] = int(grid.ravel()[end - run_lengths[label]:end].tobytes())
+
+    is_part = np.zeros(num_labels + 1, dtype=bool)
+    is_part[cell_labels[dilate(symbols).ravel()[cells]]] = True
+    sum_of_parts = int(values[is_part].sum())
+
+    # Distinct labels around every '*', gears have exactly two of them
+    label_grid = labels.reshape(grid.shape)
+    rows, cols = np.nonzero(grid == ord("*"))
+    around = np.stack(
+        [label_grid[rows + i, cols + j] for i in range(-1, 2) for j in range(-1, 2)], axis=1
+    )
+    around.sort(axis=1)
+    distinct = around != 0
+    distinct[:, 1:] &= around[:, 1:] != around[:, :-1]
+    gears = distinct.sum(axis=1) == 2
+    pairs = values[around[gears][distinct[gears]]].reshape(-1, 2)
+    gear_ratios = int((pairs[:, 0].astype(object) * pairs[:, 1]).sum())
+    return sum_of_parts, gear_ratios
+
+
+class Schematic:
+    """Engine schematic that keeps both answers up to date while cells are edited."""
+
+    def __init__(self, schematic: list) -> None:
+        lines = [line.rstrip("\n") for line in schematic]
+        width = max((len(line) for line in lines), default=0)
+        self.grid: list = [list(line.ljust(width, ".")) for line in lines]
+        self.numbers: dict = {}
+        self.cell_number: dict = {}
+        self.next_number_id: int = 0
+        self.sum_of_parts: int = 0
+        self.gear_ratios: int = 0
+        for row, line in enumerate(lines):
+            for match in NUMBER_PATTERN.finditer(line):
+                self.add_number(row, match.start(), match.end())
+        for number_id in self.numbers:
+            self.sum_of_parts += self.part_value(number_id)
+        for row, line in enumerate(lines):
+            for col, c in enumerate(line):
+                if c == "*":
+                    self.gear_ratios += self.gear_ratio(row, col)
+
+    def is_symbol(self, row: int, col: int) -> bool:
+        if not (0 <= row < len(self.grid) and 0 <= col < len(self.grid[row])):
+            return False
+        c = self.grid[row][col]
+        return not c.isdigit() and c != "."
+
+    def add_number(self, row: int, start: int, end: int) -> int:
+        number_id = self.next_number_id
+        self.next_number_id += 1
+        self.numbers[number_id] = (row, start, end, int("".join(self.grid[row][start:end])))
+        for col in range(start, end):
+            self.cell_number[(row, col)] = number_id
+        return number_id
+
+    def remove_number(self, number_id: int) -> None:
+        row, start, end, _ = self.numbers.pop(number_id)
+        for col in range(start, end):
+            del self.cell_number[(row, col)]
+
+    def border(self, number_id: int) -> list:
+        row, start, end, _ = self.numbers[number_id]
+        return [(r, col) for r in range(row - 1, row + 2) for col in range(start - 1, end + 1)]
+
+    def part_value(self, number_id: int) -> int:
+        if any(self.is_symbol(r, col) for r, col in self.border(number_id)):
+            return self.numbers[number_id][3]
+        return 0
+
+    def gear_ratio(self, row: int, col: int) -> int:
+        if not (0 <= row < len(self.grid) and 0 <= col < len(self.grid[row])):
+            return 0
+        if self.grid[row][col] != "*":
+            return 0
+        around = {
+            self.cell_number[(r, c)]
+            for r in range(row - 1, row + 2)
+            for c in range(col - 1, col + 2)
+            if (r, c) in self.cell_number
+        }
+        if len(around) != 2:
+            return 0
+        first, second = around
+        return self.numbers[first][3] * self.numbers[second][3]
+
+    def set_cell(self, row: int, col: int, c: str) -> None:
+        """Replaces one cell, re-examining only numbers and '*' around it."""
+        neighbourhood = [(r, cc) for r in range(row - 1, row + 2) for cc in range(col - 1, col + 2)]
+        affected = {self.cell_number[cell] for cell in neighbourhood if cell in self.cell_number}
+        candidates = set(neighbourhood)
+        for number_id in affected:
+            candidates.update(self.border(number_id))
+
+        self.sum_of_parts -= sum(self.part_value(number_id) for number_id in affected)
+        self.gear_ratios -= sum(self.gear_ratio(r, cc) for r, cc in candidates)
+
+        cells = {(row, col)}
+        for number_id in affected:
+            r, start, end, _ = self.numbers[number_id]
+            cells.update((r, cc) for cc in range(start, end))
+            self.remove_number(number_id)
+        self.grid[row][col] = c
+
+        added = set()
+        for r, cc in cells:
+            if (r, cc) in self.cell_number or not self.grid[r][cc].isdigit():
+                continue
+            start, end = cc, cc + 1
+            while start > 0 and self.grid[r][start - 1].isdigit():
+                start -= 1
+            while end < len(self.grid[r]) and self.grid[r][end].isdigit():
+                end += 1
+            added.add(self.add_number(r, start, end))
+        for number_id in added:
+            candidates.update(self.border(number_id))
+
+        self.sum_of_parts += sum(self.part_value(number_id) for number_id in added)
+        self.gear_ratios += sum(self.gear_ratio(r, cc) for r, cc in candidates)
+
+
 def main() -> None:
     test_one = False
     test_two = False
@@ -118,6 +495,36 @@ def main() -> None:
         print("PASSED TEST: EXAMPLE 2")
         test_two = True
 
+    if get_parts_and_gears(EXAMPLE_1) == (4361, 467835):
+        print("PASSED TEST: SPATIAL INDEX")
+
+    if get_parts_and_gears_streaming(EXAMPLE_1) == (4361, 467835):
+        print("PASSED TEST: STREAMING")
+
+    if get_parts_and_gears_parallel(EXAMPLE_1, band_size=1) == (4361, 467835):
+        print("PASSED TEST: BANDS")
+
+    if get_parts_and_gears_parallel(EXAMPLE_2, band_size=64) == get_parts_and_gears_streaming(EXAMPLE_2):
+        print("PASSED TEST: MULTI-BYTE BANDS")
+
+    if get_parts_and_gears_numpy(EXAMPLE_1) == (4361, 467835):
+        print("PASSED TEST: NUMPY")
+
+    long_numbers = [
+        "12345678901234567890*98765432109876543210",
+        "......*.............",
+        "...1234567890123....",
+    ]
+    if get_parts_and_gears_numpy_lines(long_numbers) == scan_schematic(long_numbers):
+        print("PASSED TEST: NUMPY LONG NUMBERS")
+
+    with open(EXAMPLE_1, "r", encoding="utf-8") as file:
+        schematic = Schematic(file.readlines())
+    schematic.set_cell(1, 3, ".")
+    schematic.set_cell(1, 3, "*")
+    if (schematic.sum_of_parts, schematic.gear_ratios) == (4361, 467835):
+        print("PASSED TEST: INCREMENTAL")
+
     if test_one:
         input_sum = get_sum_of_parts(INPUT)
         print(f"Sum of all adjacent numbers for Part One: {input_sum}")
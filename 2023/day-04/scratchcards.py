@@ -46,11 +46,19 @@ This process repeats until none of the copies cause you to win any more cards.
 """
 
 import re
+from itertools import islice
+
+import numpy as np
 
 EXAMPLE_1 = "./example_1.txt"
 
+EXAMPLE_2 = "./example_2.txt"
+
 INPUT = "./input.txt"
 
+CARD_PATTERN = re.compile(r"Card\s+\d+:|\|")
+BATCH_SIZE = 1 << 16
+
 
 def preprocess_input(line: str) -> tuple[int, list, list]:
     line = line.strip()
@@ -62,6 +70,84 @@ def preprocess_input(line: str) -> tuple[int, list, list]:
     return card_id, winning_numbers, my_numbers
 
 
+def count_matches(winning_numbers: list, my_numbers: list) -> int:
+    winning_numbers = set(winning_numbers)
+    return sum(1 for num in my_numbers if num in winning_numbers)
+
+
+def to_bitmask(numbers: list) -> int:
+    mask = 0
+    for num in numbers:
+        mask |= 1 << num
+    return mask
+
+
+def count_matches_bitmask(line: str) -> int:
+    """Popcount of the AND of both masks; repeated owned numbers each count, like
+    `count_matches`, so those cards are checked number by number against the winning mask."""
+    _, winning_numbers, my_numbers = preprocess_input(line)
+    winning_mask = to_bitmask(winning_numbers)
+    my_mask = to_bitmask(my_numbers)
+    if my_mask.bit_count() == len(my_numbers):
+        return (winning_mask & my_mask).bit_count()
+    return sum(winning_mask >> num & 1 for num in my_numbers)
+
+
+def how_many_points_bitmask(filename: str) -> int:
+    sum_of_points = 0
+    with open(filename, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                num_matches = count_matches_bitmask(line)
+                sum_of_points += 1 << (num_matches - 1) if num_matches else 0
+    return sum_of_points
+
+
+def card_shape(line: str) -> tuple[int, int]:
+    """Returns how many winning and owned numbers a card line has."""
+    winning_numbers, my_numbers = line.split(':')[1].split('|')
+    return len(winning_numbers.split()), len(my_numbers.split())
+
+
+def parse_deck_batch(lines: list, shape: tuple[int, int]) -> np.ndarray:
+    """Parses lines into an (n, winning + owned) array of the numbers on each card.
+
+    Every card must have the given (winning, owned) shape, otherwise the columns of
+    different cards would not line up.
+    """
+    for line in lines:
+        if card_shape(line) != shape:
+            raise ValueError(f"Card does not have {shape[0]} | {shape[1]} numbers: {line.strip()}")
+    numbers = np.array(CARD_PATTERN.sub(" ", "".join(lines)).split(), dtype=np.int64)
+    return numbers.reshape(len(lines), sum(shape))
+
+
+def count_matches_batch(deck: np.ndarray, num_winning: int) -> np.ndarray:
+    """Counts matches per card by comparing every owned number with every winning one."""
+    winning_numbers = deck[:, None, :num_winning]
+    my_numbers = deck[:, num_winning:, None]
+    return (my_numbers == winning_numbers).any(axis=2).sum(axis=1)
+
+
+def how_many_points_numpy(filename: str) -> tuple[int, np.ndarray]:
+    """Returns the total points and the match count of every card, parsed in batches."""
+    sum_of_points = 0
+    all_matches = []
+    with open(filename, 'r', encoding='utf-8') as file:
+        lines = (line for line in file if line.strip())
+        batch = list(islice(lines, BATCH_SIZE))
+        if not batch:
+            return 0, np.zeros(0, dtype=np.int64)
+        shape = card_shape(batch[0])
+        while batch:
+            matches = count_matches_batch(parse_deck_batch(batch, shape), shape[0])
+            points = np.where(matches > 0, np.left_shift(1, np.maximum(matches - 1, 0)), 0)
+            sum_of_points += int(points.sum())
+            all_matches.append(matches)
+            batch = list(islice(lines, BATCH_SIZE))
+    return sum_of_points, np.concatenate(all_matches)
+
+
 def how_many_points(filename: str) -> int:
     sum_of_points = 0
     with open(filename, 'r', encoding='utf-8') as file:
@@ -103,6 +189,53 @@ def how_many_scratchcards(filename: str) -> int:
     return sum([val for key, val in card_quantities.items() if key <= last_card_id])
 
 
+def how_many_scratchcards_linear(filename: str) -> int:
+    """Propagates copies forward with a difference array, one pass over the match counts."""
+    with open(filename, 'r', encoding='utf-8') as file:
+        matches = [count_matches(*preprocess_input(line)[1:]) for line in file if line.strip()]
+    # diff[i] holds the change in won copies between card i - 1 and card i
+    diff = [0] * (len(matches) + 1)
+    won_copies = 0
+    total_cards = 0
+    for idx, num_matches in enumerate(matches):
+        won_copies += diff[idx]
+        copies = won_copies + 1
+        total_cards += copies
+        if num_matches:
+            diff[idx + 1] += copies
+            diff[min(idx + num_matches + 1, len(matches))] -= copies
+    return total_cards
+
+
+def how_many_scratchcards_streaming(filename: str) -> int:
+    """Reads cards one at a time, keeping pending copies in a ring buffer of differences.
+
+    Copies only reach as far ahead as a card has numbers, so the buffer only grows when a
+    card with more numbers than any before it arrives, never with the number of cards.
+    """
+    ring = [0]
+    won_copies = 0
+    total_cards = 0
+    with open(filename, 'r', encoding='utf-8') as file:
+        for idx, line in enumerate(line for line in file if line.strip()):
+            _, winning_numbers, my_numbers = preprocess_input(line)
+            if len(my_numbers) + 2 > len(ring):
+                # Move the pending slots idx .. idx + len(ring) - 1 into a wider ring
+                wider = [0] * (len(my_numbers) + 2)
+                for pending in range(idx, idx + len(ring)):
+                    wider[pending % len(wider)] = ring[pending % len(ring)]
+                ring = wider
+            slot = idx % len(ring)
+            won_copies += ring[slot]
+            ring[slot] = 0
+            copies = won_copies + 1
+            total_cards += copies
+            num_matches = count_matches(winning_numbers, my_numbers)
+            if num_matches:
+                ring[(idx + 1) % len(ring)] += copies
+                ring[(idx + num_matches + 1) % len(ring)] -= copies
+    return total_cards
+
 
 def main() -> None:
     test_one = False
@@ -118,6 +251,21 @@ def main() -> None:
         print("PASSED TEST: EXAMPLE 2")
         test_two = True
 
+    if how_many_scratchcards_linear(EXAMPLE_1) == 30:
+        print("PASSED TEST: LINEAR")
+
+    if how_many_points_bitmask(EXAMPLE_1) == 13 and how_many_points_numpy(EXAMPLE_1)[0] == 13:
+        print("PASSED TEST: BITMASK")
+
+    if how_many_scratchcards_streaming(EXAMPLE_1) == 30:
+        print("PASSED TEST: STREAMING")
+
+    if (
+        how_many_points_bitmask(EXAMPLE_2) == how_many_points(EXAMPLE_2)
+        and how_many_scratchcards_streaming(EXAMPLE_2) == how_many_scratchcards(EXAMPLE_2)
+    ):
+        print("PASSED TEST: REPEATED AND UNEVEN CARDS")
+
     if test_one:
         input_points = how_many_points(INPUT)
         print(f"Sum of all points from scratchcards for Part One: {input_points}")
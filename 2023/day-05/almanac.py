@@ -51,6 +51,9 @@ What is the lowest location number that corresponds to any of the initial seed n
 """
 
 import re
+from bisect import bisect_left, bisect_right
+
+import numpy as np
 
 EXAMPLE_1 = "./example_1.txt"
 
@@ -185,6 +188,284 @@ def find_lowest_location_part_two(filename: str):
     return min(locations)
 
 
+def parse_almanac(filename: str) -> tuple[list[int], list[list]]:
+    """Returns the seeds line and every map as built by `create_map`."""
+    maps = []
+    dst, src, length = [], [], []
+    with open(filename, "r", encoding="utf-8") as file:
+        seeds = list(map(int, re.findall(r"(\d+)", file.readline())))
+        for line in file:
+            nums = list(map(int, re.findall(r"(\d+)", line)))
+            if len(nums):
+                dst.append(nums[0])
+                src.append(nums[1])
+                length.append(nums[2])
+            elif len(dst):
+                maps.append(create_map(dst, src, length))
+                dst, src, length = [], [], []
+    if len(dst):
+        maps.append(create_map(dst, src, length))
+    return seeds, maps
+
+
+def build_interval_index(seed_map: list) -> tuple[list[int], list[int]]:
+    """Turns a map into sorted breakpoints and offsets.
+
+    Values in [starts[i], starts[i + 1]) are shifted by offsets[i], the last piece extends
+    to infinity. Gaps between ranges get offset 0, so starts always begins at 0. Ranges
+    must be non-negative so every index maps [0, inf) into itself.
+    """
+    starts, offsets = [0], [0]
+    for min_dst, max_dst, min_src, max_src in sorted(seed_map, key=lambda x: x[2]):
+        if max_src < min_src:
+            continue
+        if min_src < 0 or min_dst < 0:
+            raise ValueError(f"Negative range starting at {min_src}")
+        if min_src < starts[-1] or (min_src == starts[-1] and offsets[-1] != 0):
+            raise ValueError(f"Overlapping range starting at {min_src}")
+        if min_src == starts[-1]:
+            starts.pop()
+            offsets.pop()
+        starts.extend([min_src, max_src + 1])
+        offsets.extend([min_dst - min_src, 0])
+    return starts, offsets
+
+
+def lookup(index: tuple[list[int], list[int]], seed: int) -> int:
+    starts, offsets = index
+    return seed + offsets[bisect_right(starts, seed) - 1]
+
+
+def map_seeds_bisect(seeds: list, index: tuple[list[int], list[int]]) -> list:
+    return [lookup(index, seed) for seed in seeds]
+
+
+def find_lowest_location_bisect(filename: str) -> int:
+    seeds, maps = parse_almanac(filename)
+    for seed_map in maps:
+        seeds = map_seeds_bisect(seeds, build_interval_index(seed_map))
+    return min(seeds)
+
+
+def compose(first: tuple, second: tuple, lo: int = 0, hi: int = None) -> tuple[list[int], list[int]]:
+    """Returns the index of `second(first(x))` for x in [lo, hi), hi None meaning infinity."""
+    first_starts, first_offsets = first
+    second_starts, second_offsets = second
+    starts, offsets = [], []
+    i = bisect_right(first_starts, lo) - 1
+    while i < len(first_starts) and (hi is None or first_starts[i] < hi):
+        piece_lo = max(lo, first_starts[i])
+        piece_hi = first_starts[i + 1] if i + 1 < len(first_starts) else None
+        if hi is not None and (piece_hi is None or piece_hi > hi):
+            piece_hi = hi
+        shift = first_offsets[i]
+        j = bisect_right(second_starts, piece_lo + shift) - 1
+        while j < len(second_starts) and (piece_hi is None or second_starts[j] < piece_hi + shift):
+            start = max(piece_lo, second_starts[j] - shift)
+            offset = shift + second_offsets[j]
+            if not offsets or offsets[-1] != offset:
+                starts.append(start)
+                offsets.append(offset)
+            j += 1
+        i += 1
+    return starts, offsets
+
+
+def compose_maps(maps: list) -> tuple[list[int], list[int]]:
+    """Composes every map of the almanac into a single seed-to-location index."""
+    function = ([0], [0])
+    for seed_map in maps:
+        function = compose(function, build_interval_index(seed_map))
+    return function
+
+
+def lowest_location_in_range(function: tuple, start: int, length: int) -> int:
+    """Minimum location over seeds [start, start + length); each piece is increasing."""
+    starts, offsets = function
+    i = bisect_right(starts, start) - 1
+    lowest = start + offsets[i]
+    for i in range(i + 1, bisect_right(starts, start + length - 1, i + 1)):
+        lowest = min(lowest, starts[i] + offsets[i])
+    return lowest
+
+
+def find_lowest_location_composed(filename: str) -> tuple[int, int]:
+    """Answers both parts from one composed seed-to-location function."""
+    seeds, maps = parse_almanac(filename)
+    function = compose_maps(maps)
+    part_one = min(lookup(function, seed) for seed in seeds)
+    part_two = min(
+        lowest_location_in_range(function, start, length)
+        for start, length in zip(seeds[::2], seeds[1::2])
+    )
+    return part_one, part_two
+
+
+def map_arrays(seed_map: list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns sorted source starts, exclusive source ends and offsets as int64 arrays."""
+    ranges = np.array(sorted(seed_map, key=lambda x: x[2]), dtype=np.int64).reshape(-1, 4)
+    return ranges[:, 2], ranges[:, 3] + 1, ranges[:, 0] - ranges[:, 2]
+
+
+def map_seeds_numpy(seeds: np.ndarray, arrays: tuple) -> np.ndarray:
+    starts, ends, offsets = arrays
+    if not len(starts):
+        return seeds
+    idx = np.searchsorted(starts, seeds, side="right") - 1
+    clipped = np.maximum(idx, 0)
+    inside = (idx >= 0) & (seeds < ends[clipped])
+    return seeds + np.where(inside, offsets[clipped], 0)
+
+
+def find_lowest_location_numpy(filename: str, seeds: np.ndarray = None) -> tuple[np.ndarray, int]:
+    """Maps a whole seed array through every map, the almanac seeds unless given."""
+    almanac_seeds, maps = parse_almanac(filename)
+    locations = np.asarray(almanac_seeds if seeds is None else seeds, dtype=np.int64)
+    for seed_map in maps:
+        locations = map_seeds_numpy(locations, map_arrays(seed_map))
+    return locations, int(locations.min())
+
+
+def preimage(function: tuple, start: int, length: int) -> list[tuple[int, int]]:
+    """Returns the sorted (start, length) seed ranges that land in [start, start + length)."""
+    starts, offsets = function
+    ranges = []
+    for i, (piece_lo, offset) in enumerate(zip(starts, offsets)):
+        lo = max(piece_lo, start - offset)
+        hi = start + length - offset
+        if i + 1 < len(starts):
+            hi = min(hi, starts[i + 1])
+        if lo < hi:
+            ranges.append([lo, hi])
+    ranges.sort()
+    merged = []
+    for lo, hi in ranges:
+        if merged and lo <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return [(lo, hi - lo) for lo, hi in merged]
+
+
+def seeds_for_locations(filename: str, start: int, length: int) -> list[tuple[int, int]]:
+    _, maps = parse_almanac(filename)
+    return preimage(compose_maps(maps), start, length)
+
+
+class Almanac:
+    """Seed-to-location function that is patched in place when a map range is edited.
+
+    Editing stage k only changes seeds whose image under the first k maps falls in the
+    edited source range, so only those pieces are recomposed and spliced back.
+    """
+
+    def __init__(self, seeds: list, maps: list) -> None:
+        self.seeds: list = seeds
+        self.maps: list = [list(seed_map) for seed_map in maps]
+        self.indexes: list = [build_interval_index(seed_map) for seed_map in self.maps]
+        self.prefixes: dict = {0: ([0], [0])}
+        self.suffixes: dict = {len(self.maps) - 1: ([0], [0])}
+        self.function: tuple = compose_maps(self.maps)
+        self.sorted_seeds: list = sorted((seed, i) for i, seed in enumerate(seeds))
+        self.locations: list = [lookup(self.function, seed) for seed in seeds]
+        self.seed_ranges: list = list(zip(seeds[::2], seeds[1::2]))
+        self.range_locations: list = [
+            lowest_location_in_range(self.function, start, length)
+            for start, length in self.seed_ranges
+        ]
+
+    @property
+    def lowest_location(self) -> int:
+        return min(self.locations)
+
+    @property
+    def lowest_location_part_two(self) -> int:
+        return min(self.range_locations)
+
+    def prefix(self, stage: int) -> tuple:
+        """Composition of the maps before `stage`."""
+        if stage not in self.prefixes:
+            self.prefixes[stage] = compose(self.prefix(stage - 1), self.indexes[stage - 1])
+        return self.prefixes[stage]
+
+    def suffix(self, stage: int) -> tuple:
+        """Composition of the maps after `stage`."""
+        if stage not in self.suffixes:
+            self.suffixes[stage] = compose(self.indexes[stage + 1], self.suffix(stage + 1))
+        return self.suffixes[stage]
+
+    def find_range(self, stage: int, src: int) -> list:
+        for mapping in self.maps[stage]:
+            if mapping[2] == src:
+                return mapping
+        raise ValueError(f"No range starting at {src} in map {stage}")
+
+    def add_range(self, stage: int, dst: int, src: int, length: int) -> None:
+        new_map = self.maps[stage] + create_map([dst], [src], [length])
+        self.update_map(stage, new_map, src, length)
+
+    def remove_range(self, stage: int, src: int) -> None:
+        old_range = self.find_range(stage, src)
+        new_map = [r for r in self.maps[stage] if r is not old_range]
+        self.update_map(stage, new_map, src, old_range[3] - src + 1)
+
+    def shift_range(self, stage: int, src: int, delta: int) -> None:
+        """Moves the destination of the range starting at `src` by `delta`."""
+        old_range = self.find_range(stage, src)
+        new_map = [
+            [r[0] + delta, r[1] + delta, r[2], r[3]] if r is old_range else r
+            for r in self.maps[stage]
+        ]
+        self.update_map(stage, new_map, src, old_range[3] - src + 1)
+
+    def update_map(self, stage: int, new_map: list, src: int, length: int) -> None:
+        index = build_interval_index(new_map)
+        affected = preimage(self.prefix(stage), src, length)
+        self.maps[stage] = new_map
+        self.indexes[stage] = index
+        self.prefixes = {k: v for k, v in self.prefixes.items() if k <= stage}
+        self.suffixes = {k: v for k, v in self.suffixes.items() if k >= stage}
+        for start, size in affected:
+            inner = compose(self.prefix(stage), index, start, start + size)
+            self.splice(start, start + size, compose(inner, self.suffix(stage), start, start + size))
+        self.update_answers(affected)
+
+    def splice(self, lo: int, hi: int, piece: tuple) -> None:
+        """Replaces the function over [lo, hi) with `piece`, merging equal neighbours."""
+        starts, offsets = self.function
+        tail_offset = offsets[bisect_right(starts, hi) - 1]
+        i = bisect_left(starts, lo)
+        j = bisect_right(starts, hi)
+        window_lo = max(i - 1, 0)
+        window_starts = starts[window_lo:i] + piece[0] + [hi]
+        window_offsets = offsets[window_lo:i] + piece[1] + [tail_offset]
+        if j < len(starts):
+            window_starts.append(starts[j])
+            window_offsets.append(offsets[j])
+            j += 1
+        merged_starts, merged_offsets = [], []
+        for start, offset in zip(window_starts, window_offsets):
+            if not merged_offsets or merged_offsets[-1] != offset:
+                merged_starts.append(start)
+                merged_offsets.append(offset)
+        starts[window_lo:j] = merged_starts
+        offsets[window_lo:j] = merged_offsets
+
+    def update_answers(self, affected: list) -> None:
+        for start, size in affected:
+            first = bisect_left(self.sorted_seeds, (start, -1))
+            last = bisect_left(self.sorted_seeds, (start + size, -1))
+            for seed, i in self.sorted_seeds[first:last]:
+                self.locations[i] = lookup(self.function, seed)
+        for i, (start, length) in enumerate(self.seed_ranges):
+            if any(start < lo + size and lo < start + length for lo, size in affected):
+                self.range_locations[i] = lowest_location_in_range(self.function, start, length)
+
+
+def load_almanac(filename: str) -> Almanac:
+    return Almanac(*parse_almanac(filename))
+
+
 def main() -> None:
     test_one = False
     test_two = False
@@ -199,6 +480,24 @@ def main() -> None:
         print("PASSED TEST: EXAMPLE 2")
         test_two = True
 
+    if find_lowest_location_bisect(EXAMPLE_1) == 35:
+        print("PASSED TEST: INTERVAL INDEX")
+
+    if find_lowest_location_composed(EXAMPLE_1) == (35, 46):
+        print("PASSED TEST: COMPOSED")
+
+    if find_lowest_location_numpy(EXAMPLE_1)[1] == 35:
+        print("PASSED TEST: NUMPY")
+
+    if seeds_for_locations(EXAMPLE_1, 46, 1) == [(82, 1)]:
+        print("PASSED TEST: PREIMAGE")
+
+    almanac = load_almanac(EXAMPLE_1)
+    almanac.shift_range(0, 50, 10)
+    almanac.shift_range(0, 50, -10)
+    if (almanac.lowest_location, almanac.lowest_location_part_two) == (35, 46):
+        print("PASSED TEST: INCREMENTAL")
+
     if test_one:
         input_location = find_lowest_location(INPUT)
         print(f"Lowest location for Part One: {input_location}")
@@ -33,13 +33,19 @@ actually just has very bad kerning. There's really only one race - ignore the sp
 """
 
 
+import math
 import re
 
+import numpy as np
+
 EXAMPLE_1 = "./example_1.txt"
 EXAMPLE_2 = "./example_2.txt"
 
 INPUT = "./input.txt"
 
+MAX_SAFE_TIME = math.isqrt(np.iinfo(np.int64).max // 2)
+MAX_SAFE_DISTANCE = np.iinfo(np.int64).max // 8
+
 
 def calc_distance(push_button_time: int, race_time: int) -> int:
     return push_button_time * (race_time - push_button_time)
@@ -85,6 +91,80 @@ def beat_the_record_part_two(filename: str, debug: bool = False) -> int:
         return max_time_val - min_time_val + 1
 
 
+def count_winning_times(time: int, distance: int) -> int:
+    """Counts hold times t in [0, time] with t * (time - t) > distance in O(1).
+
+    The winning times lie strictly between the roots (time -+ sqrt(time^2 - 4 distance)) / 2,
+    so the first one is found from the integer square root and nudged by exact checks.
+    """
+    discriminant = time * time - 4 * distance
+    if discriminant < 0:
+        return 0
+    first = max(0, (time - math.isqrt(discriminant)) // 2)
+    while first <= time // 2 and calc_distance(first, time) <= distance:
+        first += 1
+    while first > 0 and calc_distance(first - 1, time) > distance:
+        first -= 1
+    last = time - first
+    return last - first + 1 if first <= last else 0
+
+
+def beat_the_record_closed_form(filename: str) -> tuple[int, int]:
+    with open(filename, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+    times = list(map(int, re.findall(r"(\d+)", lines[0])))
+    distances = list(map(int, re.findall(r"(\d+)", lines[1])))
+    result = 1
+    for time, distance in zip(times, distances):
+        result *= count_winning_times(time, distance)
+    time = int("".join(re.findall(r"(\d+)", lines[0])))
+    distance = int("".join(re.findall(r"(\d+)", lines[1])))
+    return result, count_winning_times(time, distance)
+
+
+def count_winning_times_batch(times, distances) -> np.ndarray:
+    """Vectorized `count_winning_times`, falling back to exact Python integers when
+    time^2 or 4 * distance could overflow int64."""
+    times = np.asarray(times)
+    distances = np.asarray(distances)
+    fits = (
+        times.size > 0
+        and times.dtype.kind in "iu"
+        and distances.dtype.kind in "iu"
+        and times.max() <= MAX_SAFE_TIME
+        and np.abs(distances).max() <= MAX_SAFE_DISTANCE
+    )
+    if not fits:
+        return np.array(
+            [count_winning_times(int(t), int(d)) for t, d in zip(times, distances)], dtype=object
+        )
+    times = times.astype(np.int64)
+    distances = distances.astype(np.int64)
+    discriminant = times * times - 4 * distances
+    root = np.sqrt(np.maximum(discriminant, 0).astype(np.float64))
+    first = np.clip(np.floor((times - root) / 2).astype(np.int64), 0, times // 2 + 1)
+    # The float root can be off by a little, fix the boundary with exact integer checks
+    while (step := (first <= times // 2) & (first * (times - first) <= distances)).any():
+        first += step
+    while (step := (first > 0) & ((first - 1) * (times - first + 1) > distances)).any():
+        first -= step
+    counts = times - 2 * first + 1
+    return np.where((discriminant >= 0) & (counts > 0), counts, 0)
+
+
+def beat_the_record_batch(times, distances, log: bool = False):
+    """Returns the winning counts and their product, or the natural log of it."""
+    counts = count_winning_times_batch(times, distances)
+    if log:
+        if counts.dtype == object:
+            # Exact counts can be too large for float64, take their logs one by one
+            logs = (math.log(int(count)) if count else -math.inf for count in counts)
+            return counts, math.fsum(logs)
+        with np.errstate(divide="ignore"):
+            return counts, float(np.log(counts.astype(np.float64)).sum())
+    return counts, math.prod(int(count) for count in counts)
+
+
 def main() -> None:
     test_one = False
     test_two = False
@@ -99,6 +179,18 @@ def main() -> None:
         print("PASSED TEST: EXAMPLE 2")
         test_two = True
 
+    if beat_the_record_closed_form(EXAMPLE_1) == (288, 71503):
+        print("PASSED TEST: CLOSED FORM")
+
+    if beat_the_record_batch([7, 15, 30], [9, 40, 200])[1] == 288:
+        print("PASSED TEST: BATCH")
+
+    huge_time = 10**400 + 7
+    huge_distance = huge_time * huge_time // 5
+    _, log_product = beat_the_record_batch([huge_time], [huge_distance], log=True)
+    if log_product == math.log(count_winning_times(huge_time, huge_distance)):
+        print("PASSED TEST: BATCH LOG PRODUCT")
+
     if test_one:
         input_ways_to_beat_record = beat_the_record(INPUT)
         print(f"Number of ways to beat the record for Part One: {input_ways_to_beat_record}")
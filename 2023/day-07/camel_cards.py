@@ -59,10 +59,28 @@ J is always treated as J, not the card it's pretending to be: JKKK2 is weaker th
 Using the new joker rule, find the rank of every hand in your set. What are the new total winnings?
 """
 
+import heapq
+import os
+import struct
+import tempfile
+from collections import deque
+
+import numpy as np
+
 EXAMPLE = "./example.txt"
+EXAMPLE_DUPLICATES = "./example_duplicates.txt"
 
 INPUT = "./input.txt"
 
+CARD_RANKS = {card: rank for rank, card in enumerate("23456789TJQKA")}
+JOKER_RANKS = {card: rank for rank, card in enumerate("J23456789TQKA")}
+
+# Packed hand key and bid of one hand in a sorted run file
+RUN_RECORD = struct.Struct("<IQ")
+RUN_BLOCK = 1 << 12
+# Most run files open at once while merging
+MAX_FAN_IN = 64
+
 
 def get_strength_of_hand(hand: str) -> tuple:
     card_counts = [hand.count(card) for card in set(hand)]
@@ -126,6 +144,285 @@ def total_winnings_part_two(filename: str, debug: bool = False) -> int:
         return sum((i + 1) * rank[-1] for i, rank in enumerate(ranking))
 
 
+def promote_jokers(signature: tuple, jokers: int) -> tuple:
+    """Jokers always join the largest group of the other cards."""
+    if not signature:
+        return (jokers,)
+    return signature[:-1] + (signature[-1] + jokers,)
+
+
+def build_hand_types() -> dict:
+    """Maps (sorted counts of non-joker cards, number of jokers) to the hand type."""
+    hand_types = {}
+
+    def partitions(total: int, largest: int):
+        if total == 0:
+            yield ()
+            return
+        for part in range(min(total, largest), 0, -1):
+            for rest in partitions(total - part, part):
+                yield (part,) + rest
+
+    for jokers in range(6):
+        for partition in partitions(5 - jokers, 5 - jokers):
+            signature = tuple(sorted(partition))
+            hand_types[(signature, jokers)] = SIGNATURE_TYPES[promote_jokers(signature, jokers)]
+    return hand_types
+
+
+SIGNATURE_TYPES = {
+    (5,): 6,  # Five of a kind
+    (1, 4): 5,  # Four of a kind
+    (2, 3): 4,  # Full House
+    (1, 1, 3): 3,  # Three of a kind
+    (1, 2, 2): 2,  # Two pair
+    (1, 1, 1, 2): 1,  # One pair
+    (1, 1, 1, 1, 1): 0,  # High card
+}
+HAND_TYPES = build_hand_types()
+MAX_PACKED_KEY = (max(SIGNATURE_TYPES.values()) << 20) | ((1 << 20) - 1)
+# Low bits of a leaderboard index, ordering equal hands by insertion
+SEQUENCE_BITS = 40
+
+
+def pack_hand(hand: str, joker: bool = False) -> int:
+    """Packs the hand type and five 4-bit card ranks into one integer sort key."""
+    card_ranks = JOKER_RANKS if joker else CARD_RANKS
+    counts = {}
+    key = 0
+    for card in hand:
+        counts[card] = counts.get(card, 0) + 1
+        key = (key << 4) | card_ranks[card]
+    jokers = counts.pop("J", 0) if joker else 0
+    hand_type = HAND_TYPES[(tuple(sorted(counts.values())), jokers)]
+    return (hand_type << 20) | key
+
+
+def total_winnings_packed(filename: str, joker: bool = False) -> int:
+    ranking = []
+    with open(filename, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                hand, bid = line.split()
+                ranking.append((pack_hand(hand, joker), int(bid)))
+    ranking.sort(key=lambda x: x[0])
+    return sum((i + 1) * bid for i, (_, bid) in enumerate(ranking))
+
+
+def load_hands(filename: str) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the hands as an (n, 5) uint8 array of card bytes and the bids as int64."""
+    with open(filename, "r", encoding="utf-8") as file:
+        tokens = file.read().split()
+    hands = np.frombuffer("".join(tokens[0::2]).encode("ascii"), dtype=np.uint8).reshape(-1, 5)
+    return hands, np.array(tokens[1::2], dtype=np.int64)
+
+
+def pack_hands(hands: np.ndarray, joker: bool = False) -> np.ndarray:
+    """Vectorized `pack_hand` over an (n, 5) array of card bytes."""
+    card_ranks = JOKER_RANKS if joker else CARD_RANKS
+    lookup = np.zeros(256, dtype=np.int64)
+    for card, rank in card_ranks.items():
+        lookup[ord(card)] = rank
+    ranks = lookup[hands]
+    counts = (ranks[:, :, None] == np.arange(len(card_ranks))).sum(axis=1)
+    jokers = np.zeros(len(hands), dtype=np.int64)
+    if joker:
+        jokers = counts[:, card_ranks["J"]].copy()
+        counts[:, card_ranks["J"]] = 0
+    counts.sort(axis=1)
+    largest = counts[:, -1] + jokers
+    second = counts[:, -2]
+    hand_types = np.select(
+        [largest == 5, largest == 4, (largest == 3) & (second == 2), largest == 3,
+         (largest == 2) & (second == 2), largest == 2],
+        [6, 5, 4, 3, 2, 1],
+        default=0,
+    )
+    keys = hand_types
+    for i in range(5):
+        keys = (keys << 4) | ranks[:, i]
+    return keys
+
+
+def radix_argsort(keys: np.ndarray, digits: int = 6, bits: int = 4) -> np.ndarray:
+    """LSD radix sort of non-negative keys, one stable pass over each `bits`-wide digit."""
+    order = np.arange(len(keys))
+    mask = (1 << bits) - 1
+    for digit in range(digits):
+        buckets = ((keys[order] >> (digit * bits)) & mask).astype(np.uint8)
+        order = order[np.argsort(buckets, kind="stable")]
+    return order
+
+
+def total_winnings_vectorized(filename: str, joker: bool = False, radix: bool = True) -> int:
+    hands, bids = load_hands(filename)
+    keys = pack_hands(hands, joker)
+    order = radix_argsort(keys) if radix else np.argsort(keys, kind="stable")
+    return int(np.dot(np.arange(1, len(keys) + 1, dtype=np.int64), bids[order]))
+
+
+def write_run(ranking: list, directory: str) -> str:
+    ranking.sort(key=lambda x: x[0])
+    with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as run:
+        for key, bid in ranking:
+            run.write(RUN_RECORD.pack(key, bid))
+    return run.name
+
+
+def read_run(path: str):
+    with open(path, "rb") as run:
+        while block := run.read(RUN_RECORD.size * RUN_BLOCK):
+            yield from RUN_RECORD.iter_unpack(block)
+
+
+def merge_runs(runs: list, directory: str) -> str:
+    """Merges sorted runs into one new run, removing the merged files."""
+    merged = heapq.merge(*(read_run(run) for run in runs), key=lambda x: x[0])
+    with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as run:
+        for key, bid in merged:
+            run.write(RUN_RECORD.pack(key, bid))
+    for path in runs:
+        os.remove(path)
+    return run.name
+
+
+def total_winnings_external(
+    filename: str, joker: bool = False, chunk_size: int = 1 << 20, max_fan_in: int = MAX_FAN_IN
+) -> int:
+    """Sorts bounded chunks of packed hands into temporary runs and k-way merges them,
+    accumulating rank * bid while merging.
+
+    At most `max_fan_in` runs are open at once: groups of consecutive runs are merged
+    into new runs until few enough remain, which also keeps equal hands in file order.
+    """
+    if max_fan_in < 2:
+        raise ValueError("max_fan_in must be at least 2")
+    with tempfile.TemporaryDirectory() as directory:
+        runs = []
+        ranking = []
+        with open(filename, "r", encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                hand, bid = line.split()
+                ranking.append((pack_hand(hand, joker), int(bid)))
+                if len(ranking) == chunk_size:
+                    runs.append(write_run(ranking, directory))
+                    ranking = []
+        if ranking:
+            runs.append(write_run(ranking, directory))
+        while len(runs) > max_fan_in:
+            runs = [
+                merge_runs(runs[start:start + max_fan_in], directory)
+                for start in range(0, len(runs), max_fan_in)
+            ]
+        winnings = 0
+        merged = heapq.merge(*(read_run(run) for run in runs), key=lambda x: x[0])
+        for rank, (_, bid) in enumerate(merged, start=1):
+            winnings += rank * bid
+    return winnings
+
+
+class FenwickTree:
+    """Fenwick tree over indexes [1, size], storing only the nodes that were touched."""
+
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        self.tree: dict = {}
+
+    def add(self, idx: int, delta: int) -> None:
+        while idx <= self.size:
+            self.tree[idx] = self.tree.get(idx, 0) + delta
+            idx += idx & -idx
+
+    def prefix(self, idx: int) -> int:
+        total = 0
+        while idx > 0:
+            total += self.tree.get(idx, 0)
+            idx -= idx & -idx
+        return total
+
+
+class HandRanking:
+    """Total winnings of a changing set of hands under one rule set.
+
+    Hands are ordered by packed key, equal hands by insertion order like the file order
+    of the other rankings. Inserting a hand shifts every stronger hand up one rank, so
+    the total changes by its own rank * bid plus the sum of the bids above it; both come
+    from Fenwick trees indexed by the packed key followed by an insertion sequence number.
+    """
+
+    def __init__(self, joker: bool = False) -> None:
+        self.joker: bool = joker
+        self.counts: FenwickTree = FenwickTree((MAX_PACKED_KEY + 1) << SEQUENCE_BITS)
+        self.bid_sums: FenwickTree = FenwickTree((MAX_PACKED_KEY + 1) << SEQUENCE_BITS)
+        self.sequences: dict = {}
+        self.next_sequence: int = 0
+        self.total_bids: int = 0
+        self.winnings: int = 0
+
+    def shift(self, idx: int, bid: int) -> int:
+        """Rank * bid of the hand at `idx`, plus the bids of the hands above it."""
+        below = self.counts.prefix(idx)
+        above = self.total_bids - self.bid_sums.prefix(idx + 1)
+        return (below + 1) * bid + above
+
+    def add(self, hand: str, bid: int) -> None:
+        if self.next_sequence >> SEQUENCE_BITS:
+            raise OverflowError("Too many insertions for the sequence numbers")
+        idx = (pack_hand(hand, self.joker) << SEQUENCE_BITS) | self.next_sequence
+        self.next_sequence += 1
+        self.sequences.setdefault((hand, bid), deque()).append(idx)
+        self.winnings += self.shift(idx, bid)
+        self.counts.add(idx + 1, 1)
+        self.bid_sums.add(idx + 1, bid)
+        self.total_bids += bid
+
+    def remove(self, hand: str, bid: int) -> None:
+        """Removes the earliest inserted copy of the hand with this bid."""
+        if (hand, bid) not in self.sequences:
+            raise KeyError(f"{hand} {bid}")
+        copies = self.sequences[(hand, bid)]
+        idx = copies.popleft()
+        if not copies:
+            del self.sequences[(hand, bid)]
+        self.counts.add(idx + 1, -1)
+        self.bid_sums.add(idx + 1, -bid)
+        self.total_bids -= bid
+        self.winnings -= self.shift(idx, bid)
+
+
+class Leaderboard:
+    """Keeps the total winnings for both rule sets while hands are added and removed."""
+
+    def __init__(self) -> None:
+        self.rankings: tuple = (HandRanking(joker=False), HandRanking(joker=True))
+
+    @property
+    def winnings(self) -> tuple[int, int]:
+        return self.rankings[0].winnings, self.rankings[1].winnings
+
+    def add(self, hand: str, bid: int) -> tuple[int, int]:
+        for ranking in self.rankings:
+            ranking.add(hand, bid)
+        return self.winnings
+
+    def remove(self, hand: str, bid: int) -> tuple[int, int]:
+        for ranking in self.rankings:
+            ranking.remove(hand, bid)
+        return self.winnings
+
+
+def load_leaderboard(filename: str) -> Leaderboard:
+    leaderboard = Leaderboard()
+    with open(filename, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                hand, bid = line.split()
+                leaderboard.add(hand, int(bid))
+    return leaderboard
+
+
 def main() -> None:
     test_one = False
     test_two = False
@@ -140,6 +437,27 @@ def main() -> None:
         print("PASSED TEST: EXAMPLE 2")
         test_two = True
 
+    if total_winnings_packed(EXAMPLE) == 6440 and total_winnings_packed(EXAMPLE, joker=True) == 5905:
+        print("PASSED TEST: PACKED KEYS")
+
+    if total_winnings_vectorized(EXAMPLE) == 6440 and total_winnings_vectorized(EXAMPLE, True) == 5905:
+        print("PASSED TEST: RADIX SORT")
+
+    if (
+        total_winnings_external(EXAMPLE, chunk_size=1, max_fan_in=2) == 6440
+        and total_winnings_external(EXAMPLE, joker=True, chunk_size=1, max_fan_in=2) == 5905
+    ):
+        print("PASSED TEST: EXTERNAL SORT")
+
+    leaderboard = load_leaderboard(EXAMPLE)
+    leaderboard.remove("QQQJA", 483)
+    if leaderboard.add("QQQJA", 483) == (6440, 5905):
+        print("PASSED TEST: LEADERBOARD")
+
+    expected = (total_winnings(EXAMPLE_DUPLICATES), total_winnings_part_two(EXAMPLE_DUPLICATES))
+    if load_leaderboard(EXAMPLE_DUPLICATES).winnings == expected:
+        print("PASSED TEST: LEADERBOARD DUPLICATES")
+
     if test_one:
         input_total_winnings = total_winnings(INPUT)
         print(f"Total winnings for Part One: {input_total_winnings}")
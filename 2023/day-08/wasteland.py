@@ -79,6 +79,150 @@ def how_many_steps_for_ghost(filename: str, debug: bool = False) -> int:
     return math.lcm(*steps)
 
 
+def compile_network(filename: str) -> tuple[str, list, list, list]:
+    """Returns the instructions, node names and flat left/right arrays of node IDs."""
+    with open(filename, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+    instructions = lines[0].strip()
+    entries = [re.findall(r"[0-9A-Z]+", line) for line in lines[2:] if line.strip()]
+    names = [node_val for node_val, _, _ in entries]
+    ids = {name: idx for idx, name in enumerate(names)}
+    left = [ids[left] for _, left, _ in entries]
+    right = [ids[right] for _, _, right in entries]
+    return instructions, names, left, right
+
+
+def build_jump_table(network: tuple, is_end) -> tuple[list, list]:
+    """For every node, the node reached after one full pass of the instructions and the
+    steps within that pass (1-based) that land on an end node."""
+    instructions, names, left, right = network
+    moves = [left if instruction == "L" else right for instruction in instructions]
+    end_nodes = [is_end(name) for name in names]
+    pass_ends, pass_hits = [], []
+    for node in range(len(names)):
+        hits = []
+        for step, move in enumerate(moves, start=1):
+            node = move[node]
+            if end_nodes[node]:
+                hits.append(step)
+        pass_ends.append(node)
+        pass_hits.append(hits)
+    return pass_ends, pass_hits
+
+
+def steps_to_end(start: int, jump_table: tuple, cycle_length: int) -> int:
+    """Advances a whole instruction pass per lookup until a pass hits an end node."""
+    pass_ends, pass_hits = jump_table
+    steps = 0
+    node = start
+    seen = set()
+    while not pass_hits[node]:
+        if node in seen:
+            raise ValueError("End node is never reached")
+        seen.add(node)
+        steps += cycle_length
+        node = pass_ends[node]
+    return steps + pass_hits[node][0]
+
+
+def how_many_steps_compiled(filename: str) -> int:
+    network = compile_network(filename)
+    jump_table = build_jump_table(network, lambda name: name == "ZZZ")
+    return steps_to_end(network[1].index("AAA"), jump_table, len(network[0]))
+
+
+def how_many_steps_for_ghost_compiled(filename: str) -> int:
+    network = compile_network(filename)
+    jump_table = build_jump_table(network, lambda name: name[-1] == "Z")
+    starts = [idx for idx, name in enumerate(network[1]) if name[-1] == "A"]
+    return math.lcm(*(steps_to_end(start, jump_table, len(network[0])) for start in starts))
+
+
+def analyze_ghost(start: int, jump_table: tuple, cycle_length: int) -> tuple[set, int, list, int]:
+    """Finds the cycle of (node, instruction offset) states a ghost falls into.
+
+    States are only compared at offset 0, one jump per instruction pass. Returns the end
+    node hits before the cycle, the step at which the cycle starts, the hits of one lap
+    of the cycle and the cycle period in steps.
+    """
+    pass_ends, pass_hits = jump_table
+    first_pass = {}
+    nodes = []
+    node = start
+    while node not in first_pass:
+        first_pass[node] = len(nodes)
+        nodes.append(node)
+        node = pass_ends[node]
+    cycle_pass = first_pass[node]
+    hits = [
+        idx * cycle_length + hit for idx, pass_node in enumerate(nodes) for hit in pass_hits[pass_node]
+    ]
+    cycle_start = cycle_pass * cycle_length
+    period = (len(nodes) - cycle_pass) * cycle_length
+    pre_cycle = {step for step in hits if step <= cycle_start}
+    in_cycle = [step for step in hits if step > cycle_start]
+    return pre_cycle, cycle_start, in_cycle, period
+
+
+def is_at_end(ghost: tuple, step: int) -> bool:
+    pre_cycle, cycle_start, in_cycle, period = ghost
+    if step <= cycle_start:
+        return step in pre_cycle
+    return any((step - hit) % period == 0 for hit in in_cycle)
+
+
+def combine_congruences(first: tuple[int, int], second: tuple[int, int]) -> tuple[int, int]:
+    """Generalized CRT for x = r1 mod m1 and x = r2 mod m2, None when they conflict."""
+    r1, m1 = first
+    r2, m2 = second
+    g = math.gcd(m1, m2)
+    if (r2 - r1) % g:
+        return None
+    k = (r2 - r1) // g * pow(m1 // g, -1, m2 // g) % (m2 // g)
+    modulus = m1 // g * m2
+    return (r1 + m1 * k) % modulus, modulus
+
+
+def earliest_common_step(ghosts: list) -> int:
+    """First step at which every ghost stands on an end node."""
+    # Before every ghost is inside its cycle, check the first ghost's hits one by one
+    threshold = max(ghost[1] for ghost in ghosts)
+    pre_cycle, _, in_cycle, period = ghosts[0]
+    candidates = pre_cycle | {
+        step for hit in in_cycle for step in range(hit, threshold + 1, period)
+    }
+    for step in sorted(candidates):
+        if all(is_at_end(ghost, step) for ghost in ghosts):
+            return step
+
+    # Past the threshold every ghost is periodic, solve one congruence per hit choice
+    congruences = [(0, 1)]
+    for _, _, in_cycle, period in ghosts:
+        congruences = [
+            combined
+            for congruence in congruences
+            for hit in in_cycle
+            if (combined := combine_congruences(congruence, (hit % period, period))) is not None
+        ]
+    if not congruences:
+        raise ValueError("Ghosts never stand on end nodes at the same time")
+    return min(
+        residue + (threshold + 1 - residue + modulus - 1) // modulus * modulus
+        for residue, modulus in congruences
+    )
+
+
+def how_many_steps_for_ghost_crt(filename: str) -> int:
+    network = compile_network(filename)
+    jump_table = build_jump_table(network, lambda name: name[-1] == "Z")
+    ghosts = [
+        analyze_ghost(idx, jump_table, len(network[0]))
+        for idx, name in enumerate(network[1])
+        if name[-1] == "A"
+    ]
+    return earliest_common_step(ghosts)
+
+
 def main() -> None:
     test_one = False
     test_two = False
@@ -91,6 +235,16 @@ def main() -> None:
         print("PASSED TEST: EXAMPLE 2")
         test_two = True
 
+    if (
+        how_many_steps_compiled(EXAMPLE_1) == 2
+        and how_many_steps_compiled(EXAMPLE_2) == 6
+        and how_many_steps_for_ghost_compiled(EXAMPLE_3) == 6
+    ):
+        print("PASSED TEST: JUMP TABLE")
+
+    if how_many_steps_for_ghost_crt(EXAMPLE_3) == 6:
+        print("PASSED TEST: CRT")
+
     if test_one:
         input_total_steps = how_many_steps(INPUT)
         print(